@@ -1,4 +1,5 @@
 import os
+import errno
 import shutil
 import stat
 from pathlib import Path
@@ -17,28 +18,42 @@ CATEGORIES = {
 ZFOLDER_ARCHIVES = {'.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz', '.iso'}
 ZFOLDER_EXEC_FALLBACK = {'.exe', '.msi'} # Captures installers if they are ever removed from the Softwares category above
 
-def is_hidden(filepath: Path) -> bool:
+# Reverse lookup built once: extension -> (destination folder, is_zfolder)
+# Standard categories override ZFolders, and earlier categories override later ones (later keys win)
+EXT_TO_CATEGORY = {
+    **{ext: ("ZFolders", True) for ext in ZFOLDER_ARCHIVES | ZFOLDER_EXEC_FALLBACK},
+    **{ext: (category, False) for category, extensions in reversed(CATEGORIES.items()) for ext in extensions},
+}
+
+def is_hidden(entry: os.DirEntry) -> bool:
     """Checks if a file is hidden in Windows using file attributes."""
     try:
-        return bool(os.stat(filepath).st_file_attributes & stat.FILE_ATTRIBUTE_HIDDEN)
+        # On Windows scandir already fetched the attributes with the listing, so this issues no extra syscall
+        return bool(entry.stat(follow_symlinks=False).st_file_attributes & stat.FILE_ATTRIBUTE_HIDDEN)
     except OSError:
         return False
 
 def get_unique_path(destination_path: Path) -> Path:
-    """Safely handles duplicate filenames by appending a counter (e.g., file (1).ext)."""
-    if not destination_path.exists():
-        return destination_path
-
+    """Safely handles duplicate filenames by appending a counter (e.g., file (1).ext).
+    The returned name is reserved atomically with an empty placeholder file, which the move then replaces."""
     base_name = destination_path.stem
     extension = destination_path.suffix
     directory = destination_path.parent
+    new_path = destination_path
     counter = 1
 
     while True:
-        new_name = f"{base_name} ({counter}){extension}"
-        new_path = directory / new_name
-        if not new_path.exists():
+        try:
+            # O_CREAT | O_EXCL claims the name in one syscall; no other process can take it after this
+            os.close(os.open(new_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
             return new_path
+        except FileExistsError:
+            pass
+        except PermissionError:
+            # Windows reports an existing folder of the same name as access denied
+            if not new_path.exists():
+                raise
+        new_path = directory / f"{base_name} ({counter}){extension}"
         counter += 1
 
 def move_file(file_path: Path, base_dest_dir: Path, is_zfolder: bool = False):
@@ -53,11 +68,20 @@ def move_file(file_path: Path, base_dest_dir: Path, is_zfolder: bool = False):
         # Ensure the destination directory exists
         target_dir.mkdir(parents=True, exist_ok=True)
 
-        # Get unique path to prevent overwriting
+        # Get (and reserve) a unique path to prevent overwriting
         target_path = get_unique_path(target_dir / file_path.name)
 
-        # Execute the move
-        shutil.move(str(file_path), str(target_path))
+        # Execute the move: a metadata-only rename over the placeholder, since both paths live under DOWNLOADS_DIR
+        try:
+            try:
+                os.replace(file_path, target_path)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                shutil.move(str(file_path), str(target_path)) # Destination on another volume: copy + delete
+        except Exception:
+            target_path.unlink(missing_ok=True) # Release the reserved name
+            raise
         print(f"[SUCCESS] Moved: '{file_path.name}' -> '{target_path.relative_to(DOWNLOADS_DIR)}'")
 
     except PermissionError:
@@ -73,42 +97,34 @@ def organize_downloads():
 
     print(f"--- Starting File Organization in: {DOWNLOADS_DIR} ---\n")
 
-    # Non-recursive scan of the root directory
-    for file_path in DOWNLOADS_DIR.iterdir():
+    # Non-recursive scan of the root directory, listed up front since files are moved as we go
+    with os.scandir(DOWNLOADS_DIR) as it:
+        entries = list(it)
+
+    for entry in entries:
 
         # 1. Ignore directories
-        if file_path.is_dir():
+        if entry.is_dir():
             continue
 
         # 2. Ignore hidden files
-        if is_hidden(file_path):
+        if is_hidden(entry):
             continue
 
         # 3. Ignore files without extensions
-        ext = file_path.suffix.lower()
+        ext = os.path.splitext(entry.name)[1].lower()
         if not ext:
             continue
 
-        categorized = False
-
-        # 4. Standard Categories check
-        for category, extensions in CATEGORIES.items():
-            if ext in extensions:
-                move_file(file_path, DOWNLOADS_DIR / category)
-                categorized = True
-                break
-
-        if categorized:
-            continue
+        # 4. Standard Categories, then ZFolders Rules, in a single lookup
+        destination = EXT_TO_CATEGORY.get(ext)
 
-        # 5. ZFolders Rules check
-        if ext in ZFOLDER_ARCHIVES or ext in ZFOLDER_EXEC_FALLBACK:
-            move_file(file_path, DOWNLOADS_DIR / "ZFolders", is_zfolder=True)
-            categorized = True
+        # 5. Fallback
+        if destination is None:
+            continue # Explicitly doing nothing. Unknown/unsupported files remain untouched.
 
-        # 6. Fallback
-        if not categorized:
-            pass # Explicitly doing nothing. Unknown/unsupported files remain untouched.
+        category, is_zfolder = destination
+        move_file(Path(entry.path), DOWNLOADS_DIR / category, is_zfolder=is_zfolder)
 
     print("\n--- Organization Complete ---")
 
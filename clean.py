@@ -1,10 +1,24 @@
 import os
 import shutil
 import hashlib
+import filecmp
 import logging
 import ctypes
+import mmap
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Iterator, Iterable
+
+try:
+    from win32com.shell import shell, shellcon # Optional (pywin32): lets Windows delete temp files in one batch
+except ImportError:
+    shell = None
+
+try:
+    from blake3 import blake3 # Optional: multithreaded SIMD hashing, much faster than SHA-256 on large files
+except ImportError:
+    blake3 = None
 
 # --- Configuration & Setup ---
 logging.basicConfig(
@@ -20,6 +34,16 @@ PROTECTED_DIRS = {
     Path(os.environ.get('PROGRAMFILES(X86)', 'C:\\Program Files (x86)')).resolve(),
 }
 
+# Duplicate detection tuning
+MIN_DUPLICATE_SIZE = 1024         # Smaller files are ignored; not worth the syscalls to deduplicate
+FINGERPRINT_BYTES = 4096          # Bytes read from each end of a file for the cheap pre-hash check
+DIRECT_COMPARE_LIMIT = 1 << 20    # Pairs at or below this size are byte-compared instead of hashed
+HASH_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # hashlib releases the GIL, so threads overlap I/O and hashing
+HASH_CACHE_NAME = ".dupcache.sqlite"  # Per-directory digest cache, reused across runs
+HASH_CACHE_VERSION = 2            # Bump whenever the cache layout changes to invalidate old caches
+HASH_ALGORITHM = "blake3" if blake3 is not None else "sha256"  # Each algorithm's digests live in their own table
+BLAKE3_MMAP_THRESHOLD = 1 << 20   # From this size up, BLAKE3 hashes a memory map using all cores
+
 def is_admin() -> bool:
     """Safely check if the script is running with Administrator privileges."""
     try:
@@ -35,6 +59,66 @@ def is_path_safe(target_path: Path) -> bool:
             return False
     return True
 
+def open_sequential(filepath: Path):
+    """Open a file unbuffered for one front-to-back read, asking the OS for aggressive read-ahead."""
+    # On Windows O_SEQUENTIAL maps to FILE_FLAG_SEQUENTIAL_SCAN; elsewhere posix_fadvise gives the same hint
+    fd = os.open(filepath, os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_SEQUENTIAL', 0))
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return os.fdopen(fd, 'rb', buffering=0)
+    except OSError:
+        os.close(fd)
+        raise
+
+def walk_files(root: Path, exclude: Iterable[Path] = ()) -> Iterator[Tuple[str, int, int]]:
+    """Yield (path, size, mtime_ns) for every file under root, reusing each DirEntry's cached type and stat info."""
+    top = os.fspath(root)
+    # Spell excluded paths the way scandir will build them from top (e.g. './x' rather than 'x')
+    skip = {os.path.join(top, os.path.relpath(p, top)) for p in exclude}
+    stack = [top]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        # The hash cache and its -wal/-shm files, including those of scans run on subfolders
+                        if entry.path in skip or entry.name.startswith(HASH_CACHE_NAME):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            yield entry.path, st.st_size, st.st_mtime_ns
+                    except OSError:
+                        continue
+        except OSError as e:
+            logging.error(f"Could not list directory {current}: {e}")
+
+def walk_bottom_up(root: Path) -> Iterator[os.DirEntry]:
+    """Yield every DirEntry under root, each directory only after all of its contents."""
+    stack: list = [str(root)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, os.DirEntry):
+            yield item # Its contents have already been yielded
+            continue
+        try:
+            with os.scandir(item) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        stack.append(entry)
+                        stack.append(entry.path)
+                    else:
+                        yield entry
+        except OSError:
+            continue
+
 # --- Module 1: Temp File Cleaner ---
 class TempCleaner:
     def __init__(self):
@@ -43,6 +127,19 @@ class TempCleaner:
             Path(os.environ.get('LOCALAPPDATA', 'C:\\Users\\Default\\AppData\\Local')) / 'Temp'
         ]
 
+    def _delete_batch(self, paths: List[str]) -> bool:
+        """Delete all paths in a single shell operation. Returns False if unavailable or anything failed."""
+        if shell is None or not paths:
+            return False
+        # No FOF_ALLOWUNDO: temp files should be deleted outright, not sent to the Recycle Bin
+        flags = shellcon.FOF_NOCONFIRMATION | shellcon.FOF_SILENT | shellcon.FOF_NOERRORUI
+        try:
+            result, aborted = shell.SHFileOperation((0, shellcon.FO_DELETE, "\0".join(paths), None, flags, None, None))
+        except Exception as e:
+            logging.warning(f"Batch temp delete unavailable, deleting one by one: {e}")
+            return False
+        return result == 0 and not aborted
+
     def clean(self):
         print("\n--- Starting Temp File Cleanup ---")
         if not is_admin():
@@ -56,45 +153,173 @@ class TempCleaner:
             if not temp_dir.exists():
                 continue
 
-            for item in temp_dir.rglob('*'):
-                if not item.exists(): # Might have been deleted by a previous directory removal
+            # Collect first so files can be deleted in inode (MFT record) order, keeping metadata
+            # writes close together on disk; folders come out deepest-first once their contents are gone
+            files: List[Tuple[int, str, int]] = []
+            folders: List[str] = []
+            for entry in walk_bottom_up(temp_dir):
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        folders.append(entry.path)
+                    else:
+                        files.append((entry.inode(), entry.path, entry.stat(follow_symlinks=False).st_size))
+                except OSError:
                     continue
+            files.sort(key=lambda item: item[0])
+
+            if shell is not None and files:
+                batched = self._delete_batch([path for _, path, _ in files])
+                # A failed batch has usually stopped at a locked file after deleting everything before it,
+                # so count what is gone and only retry what still exists
+                remaining: List[Tuple[int, str, int]] = []
+                for item in files:
+                    _, path, size = item
+                    if not batched and os.path.lexists(path):
+                        remaining.append(item)
+                        continue
+                    total_freed += size
+                    deleted_count += 1
+                    logging.info(f"Deleted temp item: {path}")
+                files = remaining
 
+            # Fallback (no pywin32, or the batch stopped at a locked file): whatever is left, one at a time
+            for _, path, size in files:
                 try:
-                    size = item.stat().st_size if item.is_file() else 0
-                    if item.is_file():
-                        item.unlink()
-                    elif item.is_dir():
-                        item.rmdir() # Only removes if empty; shutil.rmtree is too aggressive here
-
+                    os.unlink(path)
                     total_freed += size
                     deleted_count += 1
-                    logging.info(f"Deleted temp item: {item}")
+                    logging.info(f"Deleted temp item: {path}")
+                except (PermissionError, OSError):
+                    # Silently skip files in use, locked by system, or already gone
+                    pass
+
+            for path in folders:
+                try:
+                    os.rmdir(path) # Only removes if empty; shutil.rmtree is too aggressive here
+                    deleted_count += 1
+                    logging.info(f"Deleted temp item: {path}")
                 except (PermissionError, OSError):
-                    # Silently skip files in use or locked by system
                     pass
 
         mb_freed = total_freed / (1024 * 1024)
         print(f"Cleanup Complete: Removed {deleted_count} items. Freed {mb_freed:.2f} MB.")
 
 # --- Module 2: Duplicate File Finder ---
+class HashCache:
+    """SQLite store of file digests keyed by (path, size, mtime_ns) so unchanged files are not re-hashed."""
+    def __init__(self, db_path: Path):
+        self.pending: List[Tuple[str, int, int, str]] = []
+        self.retained: Optional[Iterable[str]] = None
+        self.table = f"hashes_{HASH_ALGORITHM}"
+        self.conn: Optional[sqlite3.Connection] = None
+        try:
+            self.conn = sqlite3.connect(db_path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != HASH_CACHE_VERSION:
+                tables = self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+                for (name,) in tables:
+                    self.conn.execute(f'DROP TABLE "{name}"')
+                self.conn.execute(f"PRAGMA user_version = {HASH_CACHE_VERSION}")
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} (path TEXT PRIMARY KEY, size INT, mtime_ns INT, digest TEXT)"
+            )
+        except sqlite3.Error as e:
+            logging.error(f"Hash cache unavailable, hashing everything: {e}")
+            self.close()
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[str]:
+        if self.conn is None:
+            return None
+        try:
+            row = self.conn.execute(
+                f"SELECT digest FROM {self.table} WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, size, mtime_ns)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def put(self, path: str, size: int, mtime_ns: int, digest: str):
+        self.pending.append((path, size, mtime_ns, digest))
+
+    def retain(self, paths: Iterable[str]):
+        """Keep only rows for these paths when closing; everything else was deleted or moved since it was cached."""
+        self.retained = paths
+
+    def close(self):
+        """Write all pending digests and drop stale rows in one transaction, then release the database."""
+        if self.conn is None:
+            return
+        try:
+            if self.retained is not None:
+                self.conn.execute("CREATE TEMP TABLE seen (path TEXT PRIMARY KEY)")
+                self.conn.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((p,) for p in self.retained))
+                self.conn.execute(f"DELETE FROM {self.table} WHERE path NOT IN (SELECT path FROM seen)")
+            if self.pending:
+                self.conn.executemany(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)", self.pending)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to update hash cache: {e}")
+        finally:
+            self.conn.close()
+            self.conn = None
+            self.pending.clear()
+            self.retained = None
+
 class DuplicateFinder:
     def __init__(self, target_dir: Path):
         self.target_dir = target_dir
         self.review_dir = self.target_dir / "Duplicate_Review"
 
-    def _get_file_hash(self, filepath: Path, chunk_size: int = 8192) -> str:
-        """Calculate SHA-256 hash using memory-efficient chunking."""
-        hasher = hashlib.sha256()
+    def _get_file_hash(self, filepath: Path, chunk_size: int = 1 << 20) -> str:
+        """Calculate the file's BLAKE3 hash, or SHA-256 using memory-efficient chunking if blake3 isn't installed."""
         try:
-            with open(filepath, 'rb') as f:
-                while chunk := f.read(chunk_size):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
-        except (PermissionError, OSError) as e:
+            with open_sequential(filepath) as f:
+                if blake3 is not None:
+                    if os.fstat(f.fileno()).st_size < BLAKE3_MMAP_THRESHOLD:
+                        return blake3(f.read()).hexdigest()
+                    # Large files: hash straight from the page cache and let BLAKE3 spread the work across cores
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        return blake3(mapped, max_threads=blake3.AUTO).hexdigest()
+
+                # Python 3.11+: read/update loop runs in C with the GIL released
+                if hasattr(hashlib, 'file_digest'):
+                    return hashlib.file_digest(f, 'sha256').hexdigest()
+
+                # Reuse one buffer for every read instead of allocating per chunk
+                hasher = hashlib.sha256()
+                buf = bytearray(chunk_size)
+                view = memoryview(buf)
+                while n := f.readinto(buf):
+                    hasher.update(view[:n])
+                return hasher.hexdigest()
+        except (PermissionError, OSError, ValueError) as e: # ValueError: file emptied before it could be mapped
             logging.error(f"Failed to read file for hashing {filepath}: {e}")
             return ""
 
+    def _get_file_fingerprint(self, filepath: Path, size: int) -> Optional[bytes]:
+        """Read the first and last few KB of a file as a cheap filter before full hashing."""
+        try:
+            fd = os.open(filepath, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                tail_offset = max(size - FINGERPRINT_BYTES, FINGERPRINT_BYTES)
+                if hasattr(os, 'pread'):
+                    head = os.pread(fd, FINGERPRINT_BYTES, 0)
+                    tail = os.pread(fd, FINGERPRINT_BYTES, tail_offset) if size > FINGERPRINT_BYTES else b""
+                else: # Windows has no pread
+                    head = os.read(fd, FINGERPRINT_BYTES)
+                    tail = b""
+                    if size > FINGERPRINT_BYTES:
+                        os.lseek(fd, tail_offset, os.SEEK_SET)
+                        tail = os.read(fd, FINGERPRINT_BYTES)
+            finally:
+                os.close(fd)
+            return head + tail
+        except (PermissionError, OSError) as e:
+            logging.error(f"Failed to read file for fingerprinting {filepath}: {e}")
+            return None
+
     def find_and_move(self):
         print(f"\n--- Scanning for Duplicates in {self.target_dir} ---")
         if not is_path_safe(self.target_dir):
@@ -102,27 +327,83 @@ class DuplicateFinder:
             return
 
         # Optimization: Group by file size first to avoid hashing unique files
-        size_dict: Dict[int, List[Path]] = {}
-        for filepath in self.target_dir.rglob('*'):
-            if filepath.is_file() and not self.review_dir in filepath.parents:
-                try:
-                    size = filepath.stat().st_size
-                    size_dict.setdefault(size, []).append(filepath)
-                except OSError:
-                    continue
+        size_dict: Dict[int, List[Tuple[str, int]]] = {}
+        for filepath, size, mtime_ns in walk_files(self.target_dir, exclude=[self.review_dir]):
+            if size >= MIN_DUPLICATE_SIZE:
+                size_dict.setdefault(size, []).append((filepath, mtime_ns))
+
+        # Cache keys are relative to the target; walk_files builds every path under this prefix
+        top = os.fspath(self.target_dir)
+        prefix_len = len(top) if top.endswith(os.sep) else len(top) + 1
+
+        # Reuse digests from earlier runs first, so files whose size and mtime are unchanged are never read
+        cache = HashCache(self.target_dir / HASH_CACHE_NAME)
+        cache.retain(filepath[prefix_len:] for found in size_dict.values() for filepath, _ in found)
+        digests: Dict[str, str] = {}
+        to_hash: List[Tuple[str, str, int, int]] = [] # (path, cache key, size, mtime_ns)
+        twins: List[Tuple[str, Tuple[str, str, int, int]]] = [] # small pairs proven equal by filecmp
+        for size, found in size_dict.items():
+            if len(found) <= 1:
+                continue
+            misses: List[Tuple[str, str, int, int]] = []
+            for filepath, mtime_ns in found:
+                key = filepath[prefix_len:]
+                cached = cache.get(key, size, mtime_ns)
+                if cached:
+                    digests[filepath] = cached
+                else:
+                    misses.append((filepath, key, size, mtime_ns))
+            if not misses:
+                continue
+            if len(misses) < len(found):
+                # A miss may duplicate a cached file, and that one is only known by its digest
+                to_hash.extend(misses)
+                continue
 
-        # Filter out unique sizes
-        potential_dupes = {size: paths for size, paths in size_dict.items() if len(paths) > 1}
+            if len(misses) == 2 and size <= DIRECT_COMPARE_LIMIT:
+                # A single small pair is cheaper to compare byte-for-byte than to hash;
+                # when equal, one digest is cached for both so the next run skips the compare
+                try:
+                    if filecmp.cmp(misses[0][0], misses[1][0], shallow=False):
+                        to_hash.append(misses[0])
+                        twins.append((misses[0][0], misses[1]))
+                except OSError as e:
+                    logging.error(f"Failed to compare {misses[0][0]} and {misses[1][0]}: {e}")
+                continue
 
+            # Cheap pass: drop collisions whose first/last bytes already differ
+            fingerprint_dict: Dict[bytes, List[Tuple[str, str, int, int]]] = {}
+            for miss in misses:
+                fingerprint = self._get_file_fingerprint(Path(miss[0]), size)
+                if fingerprint is not None:
+                    fingerprint_dict.setdefault(fingerprint, []).append(miss)
+            for group in fingerprint_dict.values():
+                if len(group) > 1:
+                    to_hash.extend(group)
+
+        # Hash the rest concurrently; results are merged here in the main thread
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+            results = executor.map(self._get_file_hash, [Path(filepath) for filepath, _, _, _ in to_hash])
+            for (filepath, key, size, mtime_ns), file_hash in zip(to_hash, results):
+                if file_hash:
+                    digests[filepath] = file_hash
+                    cache.put(key, size, mtime_ns, file_hash)
+        for first, (filepath, key, size, mtime_ns) in twins:
+            if first in digests:
+                digests[filepath] = digests[first]
+                cache.put(key, size, mtime_ns, digests[first])
+        cache.close()
+
+        # Group in walk order so the first file found is the one kept
         hash_dict: Dict[str, List[Path]] = {}
-        for size, paths in potential_dupes.items():
-            for filepath in paths:
-                file_hash = self._get_file_hash(filepath)
+        for found in size_dict.values():
+            for filepath, _ in found:
+                file_hash = digests.get(filepath)
                 if file_hash:
-                    hash_dict.setdefault(file_hash, []).append(filepath)
+                    hash_dict.setdefault(file_hash, []).append(Path(filepath))
 
         # Process true duplicates
-        duplicates = {h: paths for h, paths in hash_dict.items() if len(paths) > 1}
+        duplicates = [paths for paths in hash_dict.values() if len(paths) > 1]
 
         if not duplicates:
             print("No duplicates found.")
@@ -132,7 +413,7 @@ class DuplicateFinder:
         total_dupes = 0
         space_saved = 0
 
-        for file_hash, paths in duplicates.items():
+        for paths in duplicates:
             # Keep the first file, move the rest
             original = paths[0]
             for dupe in paths[1:]:
@@ -167,25 +448,26 @@ class EmptyFolderSweeper:
             return
 
         deleted_count = 0
+        root = os.fspath(self.target_dir)
         # Bottom-up traversal ensures child folders are evaluated before parents
-        for dirpath, dirnames, filenames in os.walk(self.target_dir, topdown=False):
-            current_dir = Path(dirpath)
-
+        for dirpath, dirnames, filenames in os.walk(root, topdown=False):
             # Don't delete the target root directory itself
-            if current_dir == self.target_dir:
+            if dirpath == root:
                 continue
 
             try:
-                # Check if truly empty
-                if not any(current_dir.iterdir()):
+                # Check if truly empty; stops after the first entry
+                with os.scandir(dirpath) as it:
+                    is_empty = next(it, None) is None
+                if is_empty:
                     if dry_run:
-                        print(f"[Dry Run] Would delete: {current_dir}")
+                        print(f"[Dry Run] Would delete: {dirpath}")
                     else:
-                        current_dir.rmdir()
-                        logging.info(f"Deleted empty folder: {current_dir}")
+                        os.rmdir(dirpath)
+                        logging.info(f"Deleted empty folder: {dirpath}")
                     deleted_count += 1
             except (PermissionError, OSError) as e:
-                logging.error(f"Could not access/delete {current_dir}: {e}")
+                logging.error(f"Could not access/delete {dirpath}: {e}")
 
         action = "Would delete" if dry_run else "Deleted"
         print(f"Sweeper Complete: {action} {deleted_count} empty folders.")
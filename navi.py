@@ -1,6 +1,10 @@
 import os
 import sys
+import queue
+import pickle
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pyfiglet
 from prompt_toolkit import PromptSession
 from prompt_toolkit.completion import Completer, Completion
@@ -8,7 +12,6 @@ from prompt_toolkit.history import InMemoryHistory
 from prompt_toolkit.shortcuts import clear
 from rich.console import Console
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.text import Text
 from rich.panel import Panel
 
@@ -17,29 +20,291 @@ console = Console()
 # ---------------------------------------------------------------------------
 # 1. CORE INDEXING & CACHING LOGIC
 # ---------------------------------------------------------------------------
+def pack_names(names):
+    """Lowercases names and packs them NUL-separated into one UTF-8 blob."""
+    return "\0".join(names).lower().encode('utf-8', 'surrogatepass')
+
+def join_names(blob, pieces):
+    """Appends NUL-separated name blobs to blob, skipping empty ones so they add no separator.
+    Returns the joined blob and each piece's (start, end) span in it."""
+    parts = [blob] if blob else []
+    offset = len(blob) + 1 if blob else 0
+    spans = []
+    for piece in pieces:
+        if not piece:
+            spans.append((0, 0))
+            continue
+        parts.append(piece)
+        spans.append((offset, offset + len(piece)))
+        offset += len(piece) + 1
+    return b"\0".join(parts), spans
+
+def find_matches(query, paths, names_blob, limit):
+    """Returns up to `limit` entries of paths whose packed basename in names_blob contains query.
+    A match's entry index is recovered by counting the separators skipped since the previous match."""
+    needle = query.lower().encode('utf-8', 'surrogatepass')
+    matches = []
+    if b"\0" in needle:
+        return matches
+
+    index = 0 # Entry that starts at offset `start`
+    start = 0
+    pos = names_blob.find(needle)
+    while pos != -1 and len(matches) < limit:
+        index += names_blob.count(b"\0", start, pos)
+        matches.append(paths[index])
+        end = names_blob.find(b"\0", pos + len(needle))
+        if end == -1:
+            break
+        index += 1
+        start = end + 1
+        pos = names_blob.find(needle, start)
+    return matches
+
+def default_cache_path(root_drive):
+    """Per-drive location of the saved index, e.g. %LOCALAPPDATA%\\SOMS-Nav\\index_D.pickle."""
+    base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    tag = "".join(c for c in root_drive if c.isalnum()) or "root"
+    return os.path.join(base, 'SOMS-Nav', f'index_{tag}.pickle')
+
 class DriveIndex:
-    def __init__(self, root_drive="D:\\"):
+    CACHE_VERSION = 4 # Bump when the pickled layout changes so stale caches are rebuilt
+
+    def __init__(self, root_drive="D:\\", cache_path=None):
         self.root_drive = root_drive
+        self.cache_path = cache_path or default_cache_path(root_drive)
         self.folders = []
+        # Lowercased basenames parallel to self.folders, packed NUL-separated into one bytes blob
+        # instead of millions of small str objects; matched with a single C-level bytes.find
+        self.folder_names_blob = b""
         self.files = []
-        self.is_ready = False
+        self.file_names_blob = b"" # Same layout, parallel to self.files
+        # Per-directory listings stamped with the directory's mtime, so a rescan can skip unchanged folders.
+        # Once merged, a listing keeps only the (start, end) span of its names in the blobs above, so every
+        # name is stored once. Its path lists share their str objects with self.folders and self.files.
+        self.listings = {}
+        self.lock = threading.Lock() # Guards swapping in a rebuilt index while the UI is reading it
+        self.is_ready = False # Index is complete (or loaded from cache)
+        self.partial_ready = False # At least part of the drive is searchable
+        self.is_scanning = False
+        # Problem hit by the background build; shown in the prompt toolbar, since printing would overwrite the prompt
+        self.error = None
+        self.stop_event = threading.Event() # Set on exit so an in-progress build stops scheduling scans
+        self._executor = None
+
+    @staticmethod
+    def _scan_dir(path, previous=None):
+        """Lists a single directory, reusing the previous listing if the directory is unchanged.
+        Returns (mtime_ns, folders, folder names blob, subdirs to descend, files, file names blob),
+        or None if it is gone."""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        if previous is not None and previous[0] == mtime_ns:
+            return previous
+
+        prefix = path if path.endswith(os.sep) else path + os.sep
+        folders, folder_names, subdirs, files, file_names = [], [], [], [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    full_path = prefix + entry.name
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        folders.append(full_path)
+                        folder_names.append(entry.name)
+                        # Like os.walk, list symlinked folders but don't follow them
+                        if not entry.is_symlink():
+                            subdirs.append(full_path)
+                    else:
+                        files.append(full_path)
+                        file_names.append(entry.name)
+        except OSError:
+            mtime_ns = None # Unreadable directory (permissions, vanished); never reuse this listing
+        return mtime_ns, folders, pack_names(folder_names), subdirs, files, pack_names(file_names)
+
+    def _flatten(self, listings, paths, folder_blob, file_blob):
+        """Appends the listings at paths to the given blobs and returns (folders, folder blob, files, file blob).
+        Each listing's names are replaced by their span in the returned blobs; spans left by an earlier
+        merge are read from the blobs currently being served."""
+        folders, folder_pieces, files, file_pieces = [], [], [], []
+        for path in paths:
+            _, dir_folders, dir_folder_names, _, dir_files, dir_file_names = listings[path]
+            folders.extend(dir_folders)
+            files.extend(dir_files)
+            if not isinstance(dir_folder_names, bytes):
+                dir_folder_names = self.folder_names_blob[dir_folder_names[0]:dir_folder_names[1]]
+            if not isinstance(dir_file_names, bytes):
+                dir_file_names = self.file_names_blob[dir_file_names[0]:dir_file_names[1]]
+            folder_pieces.append(dir_folder_names)
+            file_pieces.append(dir_file_names)
+
+        folder_blob, folder_spans = join_names(folder_blob, folder_pieces)
+        file_blob, file_spans = join_names(file_blob, file_pieces)
+        for path, folder_span, file_span in zip(paths, folder_spans, file_spans):
+            mtime_ns, dir_folders, _, subdirs, dir_files, _ = listings[path]
+            listings[path] = (mtime_ns, dir_folders, folder_span, subdirs, dir_files, file_span)
+        return folders, folder_blob, files, file_blob
+
+    def _apply(self, listings):
+        """Flattens per-directory listings into the searchable lists and swaps them in."""
+        folders, folder_blob, files, file_blob = self._flatten(listings, list(listings), b"", b"")
+        with self.lock:
+            self.folders = folders
+            self.folder_names_blob = folder_blob
+            self.files = files
+            self.file_names_blob = file_blob
+            self.listings = listings
+
+    def _extend(self, listings, paths):
+        """Appends the listings at paths to the index being served, leaving what is already there untouched.
+        The lists grow in place, so a reader still holding the older blob sees a consistent prefix."""
+        folders, folder_blob, files, file_blob = self._flatten(
+            listings, paths, self.folder_names_blob, self.file_names_blob
+        )
+        with self.lock:
+            self.folders.extend(folders)
+            self.files.extend(files)
+            self.folder_names_blob = folder_blob
+            self.file_names_blob = file_blob
+            self.listings = listings
+
+    def build_index(self, max_workers=8, publish_interval=0.5):
+        """Scans the drive and caches paths in memory for instant searching.
+        Folders whose mtime matches the loaded cache are not listed again. On a first build the partial
+        index is published every publish_interval seconds so searches work while scanning continues."""
+        self.is_scanning = True
+        try:
+            self._build_index(max_workers, publish_interval)
+        except Exception as e:
+            # Surface it in the toolbar; a traceback printed from this thread would land on top of the prompt
+            self.error = f"Indexing failed: {e}"
+        finally:
+            self.is_scanning = False # Never leave the spinner running, however the build ended
 
-    def build_index(self):
-        """Scans the drive and caches paths in memory for instant searching."""
+    def _build_index(self, max_workers, publish_interval):
         if not os.path.exists(self.root_drive):
-            console.print(f"[bold red]Error: Drive {self.root_drive} not found.[/bold red]")
+            self.error = f"Drive {self.root_drive} not found."
             self.is_ready = True
             return
 
-        for root, dirs, files in os.walk(self.root_drive):
-            # Cache folders (storing full paths)
-            for d in dirs:
-                self.folders.append(os.path.join(root, d))
-            # Cache files
-            for f in files:
-                self.files.append(os.path.join(root, f))
+        # A refresh keeps serving the complete loaded index and only swaps at the end
+        publish_partial = not self.is_ready
+        last_publish = float('-inf')
+        unpublished = [] # Directories listed since the last partial publish
 
+        # Directories are listed concurrently so seeks overlap; results are merged here on one thread
+        previous = self.listings
+        listings = {}
+        results = queue.SimpleQueue()
+
+        def scan(path):
+            result = None
+            try:
+                result = self._scan_dir(path, previous.get(path))
+            finally:
+                results.put((path, result))
+
+        executor = self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            executor.submit(scan, self.root_drive)
+            outstanding = 1
+            while outstanding and not self.stop_event.is_set():
+                try:
+                    path, listing = results.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                outstanding -= 1
+                if listing is None:
+                    continue
+                listings[path] = listing
+                for d in listing[3]:
+                    executor.submit(scan, d)
+                    outstanding += 1
+
+                # Each publish only flattens the new directories, but still copies the blobs, so it is throttled
+                if publish_partial:
+                    unpublished.append(path)
+                    if time.monotonic() - last_publish >= publish_interval:
+                        self._extend(listings, unpublished)
+                        unpublished = []
+                        self.partial_ready = True
+                        last_publish = time.monotonic()
+        except RuntimeError:
+            if not self.stop_event.is_set(): # submit() after stop() shut the pool down
+                raise
+        finally:
+            self._executor = None
+            # Drop queued scans; the pool's workers are non-daemon and would otherwise drain them before exit
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if self.stop_event.is_set():
+            return
+
+        if publish_partial:
+            self._extend(listings, unpublished)
+        else:
+            self._apply(listings)
+        self.partial_ready = True
+        self.is_ready = True
+        self.save_cache()
+
+    def stop(self):
+        """Abandons an in-progress build so the app can exit without listing the rest of the drive."""
+        self.stop_event.set()
+        executor = self._executor
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def load_cache(self):
+        """Loads the index saved by a previous run. Returns True if it belongs to this drive and is usable."""
+        try:
+            with open(self.cache_path, 'rb') as fh:
+                data = pickle.load(fh)
+            # st_dev is the volume serial number on Windows, so a swapped drive won't reuse the cache
+            volume = os.stat(self.root_drive).st_dev
+            if (data['version'], data['root'], data['volume']) != (self.CACHE_VERSION, self.root_drive, volume):
+                return False
+            # The saved spans already index the saved blobs, so only the path lists need rebuilding
+            folders, files = [], []
+            for _, dir_folders, _, _, dir_files, _ in data['listings'].values():
+                folders.extend(dir_folders)
+                files.extend(dir_files)
+            with self.lock:
+                self.folders = folders
+                self.folder_names_blob = data['folder_names_blob']
+                self.files = files
+                self.file_names_blob = data['file_names_blob']
+                self.listings = data['listings']
+        except Exception:
+            return False
+
+        self.partial_ready = True
         self.is_ready = True
+        return True
+
+    def save_cache(self):
+        """Writes the index to disk so the next start can load it instantly."""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            data = {
+                'version': self.CACHE_VERSION,
+                'root': self.root_drive,
+                'volume': os.stat(self.root_drive).st_dev,
+                'listings': self.listings,
+                'folder_names_blob': self.folder_names_blob,
+                'file_names_blob': self.file_names_blob,
+            }
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'wb') as fh:
+                pickle.dump(data, fh, protocol=5)
+            os.replace(tmp_path, self.cache_path) # Never leave a half-written cache behind
+        except OSError as e:
+            self.error = f"Could not save index cache: {e}"
 
 # ---------------------------------------------------------------------------
 # 2. AUTO-COMPLETER FOR PROMPT_TOOLKIT
@@ -50,14 +315,16 @@ class FolderCompleter(Completer):
 
     def get_completions(self, document, complete_event):
         word_before_cursor = document.text_before_cursor.lower()
-        if not word_before_cursor or not self.index_cache.is_ready:
-            return
+        if not word_before_cursor:
+            return # Whatever has been indexed so far is served, even while the scan is running
 
         # Filter cached folders based on user input (Partial matching)
-        # Limit to 15 results to keep the UI snappy
-        matches = [f for f in self.index_cache.folders if word_before_cursor in os.path.basename(f).lower()]
+        # Stop after 15 results to keep the UI snappy
+        with self.index_cache.lock:
+            folders = self.index_cache.folders
+            names_blob = self.index_cache.folder_names_blob
 
-        for match in matches[:15]:
+        for match in find_matches(word_before_cursor, folders, names_blob, 15):
             # Yield completion. start_position replaces the currently typed text with the full path
             yield Completion(match, start_position=-len(word_before_cursor), display=os.path.basename(match), display_meta=match)
 
@@ -77,10 +344,36 @@ def display_banner():
     panel = Panel(styled_text, title="[bold white]Professional File Navigator[/bold white]", border_style="bright_blue")
     console.print(panel)
 
+SPINNER_FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+
+def index_status_toolbar(index_cache):
+    """Bottom toolbar for the prompt: a spinner while the index is being built, then its size."""
+    def toolbar():
+        folders, files = len(index_cache.folders), len(index_cache.files)
+        frame = SPINNER_FRAMES[int(time.monotonic() * 10) % len(SPINNER_FRAMES)]
+        if not index_cache.partial_ready:
+            # Nothing published yet: still on the first directories, or the build never got going
+            status = f" {frame} Indexing {index_cache.root_drive}..." if index_cache.is_scanning else " Nothing indexed"
+        elif not index_cache.is_scanning:
+            status = f" Index ready: {folders:,} folders, {files:,} files"
+        elif index_cache.is_ready:
+            status = f" {frame} Refreshing index of {index_cache.root_drive}..."
+        else:
+            status = f" {frame} Indexing {index_cache.root_drive}... {folders:,} folders, {files:,} files so far"
+        if index_cache.error:
+            status += f"  |  {index_cache.error}"
+        return status
+    return toolbar
+
 def search_files(index_cache, query):
     """Searches files and displays them in a structured Rich Table."""
     query = query.lower()
-    matches = [f for f in index_cache.files if query in os.path.basename(f).lower()][:20]
+    with index_cache.lock:
+        files = index_cache.files
+        names_blob = index_cache.file_names_blob
+    matches = find_matches(query, files, names_blob, 20)
+    if not index_cache.is_ready:
+        console.print("[dim]Index is still being built; results may be incomplete.[/dim]")
 
     if not matches:
         console.print(f"[yellow]No files found matching '{query}'.[/yellow]")
@@ -106,14 +399,16 @@ def main():
     target_drive = "D:\\"
     index_cache = DriveIndex(target_drive)
 
-    # Run indexing in a background thread while showing a loading spinner
-    console.print(f"[dim]Initializing smart index for {target_drive}...[/dim]")
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        progress.add_task(description="Caching file system for instant search...", total=None)
+    if index_cache.load_cache():
+        # Serve the saved index right away and rescan only changed folders in the background
+        console.print(f"[dim]Loaded saved index for {target_drive}; refreshing changed folders in the background...[/dim]")
+    else:
+        console.print(f"[dim]Initializing smart index for {target_drive} in the background...[/dim]")
 
-        index_thread = threading.Thread(target=index_cache.build_index)
-        index_thread.start()
-        index_thread.join() # Wait for index to finish before allowing input
+    # Indexing runs in a real background thread; the prompt opens immediately and serves partial results.
+    # Flag the scan before starting it, so the first toolbar draw doesn't report "Nothing indexed"
+    index_cache.is_scanning = True
+    threading.Thread(target=index_cache.build_index, daemon=True).start()
 
     console.print("[bold green]Ready![/bold green] Type a folder name to auto-complete, 'search <name>' for files, or 'help'.\n")
 
@@ -121,7 +416,9 @@ def main():
     session = PromptSession(
         history=InMemoryHistory(),
         completer=FolderCompleter(index_cache),
-        complete_while_typing=True
+        complete_while_typing=True,
+        bottom_toolbar=index_status_toolbar(index_cache),
+        refresh_interval=0.5 # Redraws the toolbar so the spinner and counts stay live
     )
 
     previous_dir = None
@@ -184,5 +481,8 @@ def main():
         except Exception as e:
             console.print(f"[bold red]An error occurred: {e}[/bold red]")
 
+    # Don't keep the process alive listing the rest of the drive
+    index_cache.stop()
+
 if __name__ == "__main__":
     main()